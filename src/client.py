@@ -1,14 +1,23 @@
 import socket
-import json
+import sys
 import argparse
 import time
 import threading
-import queue
-from collections import deque
-from src.network_device import NetworkDevice
+import selectors
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from collections import OrderedDict, deque
+from src.network_device import (NetworkDevice, json_loads, pack_handshake, unpack_handshake, handshake_params_valid,
+                                HANDSHAKE_OK, HANDSHAKE_FIELD_MAX, MAX_WINDOW_SIZE, SEQ_MASK)
 from src.core import settings
 from src.constants.constants_client import CLIENT_LOGS, CLIENT_ERRORS
 from src.core.settings import DEFAULT_PORT
+from src.core.logger import setup_logging
+
+# Packet types looked up on every packet; bound once as module globals instead of settings attributes.
+DATA_TYPE = settings.DATA_TYPE
+ACK_TYPE = settings.ACK_TYPE
+NACK_TYPE = settings.NACK_TYPE
+LIST_RESPONSE_TYPE = settings.LIST_RESPONSE_TYPE
 
 class Client(NetworkDevice):
     def __init__(self, server_addr='127.0.0.1', server_port=DEFAULT_PORT, protocol='gbn', max_fragment_size=3, window_size=4):
@@ -19,38 +28,61 @@ class Client(NetworkDevice):
         self.is_connected = False
         self._receiver_thread = None  
         self._stop_event = threading.Event()
-        self._ack_queue = queue.Queue()
+        self._wakeup_r = None
+        self._wakeup_w = None
+        self._pending_list = None
+        self._ack_deque = deque()
+        self._ack_event = threading.Event()
         self._last_messages = deque(maxlen=50)
         self._last_full_messages = deque(maxlen=50)
-        self._reassembly = {}
-        self.packet_buffer = {} 
-        self.ack_received = set() 
+        self._reassembly = OrderedDict()
+        self.packet_buffer = [None] * self.window_size 
+        # When each buffered fragment was first sent; None once retransmitted (Karn: no RTT sample).
+        self._sent_at = [None] * self.window_size
+        # Bit i is set when base_seq_num + i has been ACKed (SR).
+        self.ack_bitmap = 0 
+        self._srtt = None
+        self._rttvar = 0.0
+        self._rto = self.timeout
         self.last_timeout = 0 
         self.retry_count = 0   
         self.max_retries = 5 
         
         self.simulation_mode = "normal" 
         
+        self._print_window_state()
+
+    def _print_window_state(self):
+        """Print the current sender window and which sequences are still waiting for ACK"""
         window_start = self.base_seq_num
         window_end = window_start + self.window_size - 1
         print(CLIENT_LOGS.WINDOW_SR.format(window_start=window_start, window_end=window_end))
-        acked_in_window = [seq for seq in self.ack_received if window_start <= seq <= window_end]
+        window_bits = self.ack_bitmap & ((1 << self.window_size) - 1)
+        acked_in_window = [window_start + i for i in range(self.window_size) if window_bits >> i & 1]
         if acked_in_window:
-            print(CLIENT_LOGS.WINDOW_ACKED.format(acked_in_window=sorted(acked_in_window)))
+            print(CLIENT_LOGS.WINDOW_ACKED.format(acked_in_window=acked_in_window))
         
         unacked = [seq for seq in range(window_start, min(self.next_seq_num, window_end + 1))
-                    if seq not in self.ack_received]
+                    if not self.is_acked(seq)]
         if unacked:
             print(CLIENT_LOGS.WINDOW_WAITING_ACK.format(unacked=unacked))
     
+    def is_acked(self, seq):
+        """Check the selective-repeat ACK bitmap for a sequence number"""
+        return seq < self.base_seq_num or (self.ack_bitmap >> (seq - self.base_seq_num)) & 1 == 1
+
     def connect(self):
         """Establish a connection with the server using the three-way handshake protocol"""
+        if not handshake_params_valid(self.connection_params['max_fragment_size'], self.connection_params['window_size']):
+            raise ValueError(CLIENT_ERRORS.INVALID_PARAMS.format(max_fragment_size=HANDSHAKE_FIELD_MAX, max_window_size=MAX_WINDOW_SIZE))
+        self.reset_parameters()
         self._socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.configure_socket(self._socket)
         self._socket.connect((self.server_addr, self.server_port))
 
         print(CLIENT_LOGS.CONNECTED.format(server_addr=self.server_addr, server_port=self.server_port))
         print(CLIENT_LOGS.SENDING_SYN.format(protocol=self.protocol, max_fragment_size=self.max_fragment_size, window_size=self.window_size))
-        self.handle_packet(settings.SYN_TYPE, json.dumps(self.connection_params))
+        self.handle_packet(settings.SYN_TYPE, pack_handshake(**self.connection_params))
 
         print(CLIENT_LOGS.WAIT_SYNACK)
         response_packet = self._socket.recv(self.BUFFER_SIZE)
@@ -61,27 +93,28 @@ class Client(NetworkDevice):
         if not parsed:
             raise ValueError(CLIENT_ERRORS.INVALID_RESPONSE)
 
-        syn_ack_data = json.loads(parsed['payload'])
-        print(CLIENT_LOGS.RECEIVED_SYNACK.format(syn_ack_data=syn_ack_data))
+        syn_ack_data = unpack_handshake(parsed['payload'])
+        if syn_ack_data is None:
+            raise ValueError(CLIENT_ERRORS.INVALID_RESPONSE)
+        print(CLIENT_LOGS.RECEIVED_SYNACK.format(syn_ack_data=syn_ack_data._asdict()))
 
-        if syn_ack_data.get('status') != 'ok':
-            raise ConnectionError(CLIENT_ERRORS.HANDSHAKE_FAILED.format(message=syn_ack_data.get('message', 'Unknown error')))
+        if syn_ack_data.status != HANDSHAKE_OK:
+            raise ConnectionError(CLIENT_ERRORS.HANDSHAKE_FAILED.format(message=f"status {syn_ack_data.status}"))
 
-        self.session_id = syn_ack_data.get('session_id')
-        self.max_fragment_size = syn_ack_data.get('max_fragment_size', self.max_fragment_size)
-        self.protocol = syn_ack_data.get('protocol', self.protocol)
-        self.window_size = syn_ack_data.get('window_size', self.window_size)
-        self.connection_params['max_fragment_size'] = self.max_fragment_size
-        self.connection_params['protocol'] = self.protocol
-        self.connection_params['window_size'] = self.window_size
+        self.session_id = syn_ack_data.session_id
+        self.protocol = syn_ack_data.protocol
+        self.max_fragment_size = syn_ack_data.max_fragment_size
+        self.window_size = syn_ack_data.window_size
+        self.connection_params.update(protocol=self.protocol, max_fragment_size=self.max_fragment_size, window_size=self.window_size)
 
         print(CLIENT_LOGS.SENDING_ACK)
-        ack_data = {'session_id': self.session_id, 'message': 'Connection established'}
-        self.handle_packet(settings.HANDSHAKE_ACK_TYPE, json.dumps(ack_data))
+        ack_data = pack_handshake(self.protocol, self.max_fragment_size, self.window_size, session_id=self.session_id)
+        self.handle_packet(settings.HANDSHAKE_ACK_TYPE, ack_data)
 
         self.handshake_complete = True
         self.is_connected = True
         self._stop_event.clear()
+        self._wakeup_r, self._wakeup_w = socket.socketpair()
         self._receiver_thread = threading.Thread(target=self._receiver_loop, daemon=True)
         self._receiver_thread.start()
         print(CLIENT_LOGS.HANDSHAKE_SUCCESS)
@@ -89,58 +122,133 @@ class Client(NetworkDevice):
         return True
 
     def send_message(self, message):
-        """Fragment and send a message using sliding window protocol with simulation modes"""
+        """Fragment and send a message using a sliding window (up to window_size fragments in flight)"""
         if not self.handshake_complete or not self._socket:
             raise ConnectionError(CLIENT_ERRORS.FAILED_CONNECT.format(error='Not connected'))
         if not isinstance(message, str):
             raise ValueError(CLIENT_ERRORS.INVALID_INPUT)
-        self.reset_parameters()
+        self._reset_window()
         fragments = self.fragment_message(message)
         print(CLIENT_LOGS.MESSAGE_FRAGMENTED.format(num_chunks=len(fragments), max_fragment_size=self.max_fragment_size))
-        for seq_num, fragment in enumerate(fragments):
-            self._send_fragment_with_ack(seq_num, fragment, len(fragments))
+        first_seq = self.next_seq_num
+        while self.base_seq_num < first_seq + len(fragments):
+            self._fill_window(fragments, first_seq)
+            parsed = self._next_response(self._rto)
+            if parsed is None:
+                self._handle_timeout()
+                continue
+            self._process_response(parsed)
+            self._drain_responses()
         print(CLIENT_LOGS.MESSAGE_SENT.format(num_fragments=len(fragments)))
         return True
 
-    def _send_fragment_with_ack(self, seq_num, fragment, total_fragments):
-        """Send a single fragment and wait for ACK/NACK, retrying as needed."""
+    def _fill_window(self, fragments, first_seq):
+        """Send every pending fragment that fits in the window without waiting for ACKs; fragments[0] has sequence first_seq."""
+        create_packet = self.create_packet
+        window_size = self.window_size
+        total_fragments = len(fragments)
+        end_seq = first_seq + total_fragments
+        batch = []
+        while self.next_seq_num < end_seq and self.next_seq_num - self.base_seq_num < window_size:
+            seq_num = self.next_seq_num
+            index = seq_num - first_seq
+            fragment = fragments[index]
+            last_packet = (seq_num == end_seq - 1)
+            data_packet = create_packet(DATA_TYPE, fragment, sequence_num=seq_num & SEQ_MASK, last_packet=last_packet)
+            self.packet_buffer[seq_num % window_size] = data_packet
+            print(CLIENT_LOGS.SENDING_FRAGMENT.format(current=index+1, total=total_fragments, fragment=bytes(fragment).decode('utf-8', 'replace'), seq_num=seq_num))
+            batch.append(data_packet)
+            self.next_seq_num += 1
+        if batch:
+            now = time.monotonic()
+            for seq in range(self.next_seq_num - len(batch), self.next_seq_num):
+                self._sent_at[seq % window_size] = now
+            self.sendmsg_all(self._socket, batch)
+            self._print_window_state()
+
+    def _process_response(self, parsed):
+        """Apply an ACK/NACK from the server to the window; progress resets the retry counter."""
+        old_base = self.base_seq_num
+        ptype = parsed['type']
+        if ptype == ACK_TYPE:
+            self.handle_ack(parsed)
+        elif ptype == NACK_TYPE:
+            self.handle_nack(parsed)
+        if self.base_seq_num != old_base:
+            self.retry_count = 0
+
+    def _drain_responses(self):
+        """Process every ACK/NACK already queued without blocking, so the next window refill covers the whole burst."""
+        while self._ack_deque:
+            self._process_response(self._ack_deque.popleft())
+
+    def _next_response(self, timeout):
+        """Pop the next ACK/NACK handed over by the receiver thread, waiting up to timeout seconds."""
         while True:
-            encoded_message = fragment.encode('utf-8')
-            last_packet = (seq_num == total_fragments - 1)
-            data_packet = self.create_packet(settings.DATA_TYPE, encoded_message, sequence_num=seq_num, last_packet=last_packet)
-            print(CLIENT_LOGS.SENDING_FRAGMENT.format(current=seq_num+1, total=total_fragments, fragment=fragment, seq_num=seq_num))
-            self._socket.sendall(data_packet)
-            while True:
-                try:
-                    parsed = self._ack_queue.get(timeout=5.0)
-                except queue.Empty:
-                    raise ConnectionError(CLIENT_ERRORS.NO_RESPONSE)
-                if parsed.get('sequence') != seq_num:
-                    continue
-                if parsed['type'] == settings.ACK_TYPE:
-                    print(CLIENT_LOGS.SERVER_ACK.format(seq_num=seq_num))
-                    break
-                if parsed['type'] == settings.NACK_TYPE:
-                    print(CLIENT_LOGS.SERVER_NACK.format(seq_num=seq_num))
-                    break
-            if parsed['type'] == settings.ACK_TYPE:
-                break
+            if self._ack_deque:
+                return self._ack_deque.popleft()
+            self._ack_event.clear()
+            if self._ack_deque:
+                continue
+            if not self._ack_event.wait(timeout):
+                return None
+
+    def _handle_timeout(self):
+        """Retransmit the outstanding fragments after an ACK timeout, giving up after max_retries."""
+        self.retry_count += 1
+        self.last_timeout = time.time()
+        if self.retry_count > self.max_retries:
+            raise ConnectionError(CLIENT_ERRORS.MAX_RETRIES.format(max_retries=self.max_retries))
+        print(CLIENT_LOGS.TIMEOUT_RESEND.format(base_seq_num=self.base_seq_num, next_seq_num_minus1=self.next_seq_num - 1,
+                                                retry_count=self.retry_count, max_retries=self.max_retries))
+        # Back off so a slow path is not flooded with duplicates while the estimate catches up.
+        self._rto = min(self._rto * 2, settings.MAX_RETRANSMIT_TIMEOUT)
+        seqs = [seq for seq in range(self.base_seq_num, self.next_seq_num)
+                if not (self.protocol == 'sr' and self.is_acked(seq))]
+        for seq in seqs:
+            self._sent_at[seq % self.window_size] = None
+        self.sendmsg_all(self._socket, [self.packet_buffer[seq % self.window_size] for seq in seqs])
+
+    def _sample_rtt(self, seq):
+        """Fold the RTT of a fragment sent only once into the retransmit timeout (RFC 6298 smoothing)."""
+        sent_at = self._sent_at[seq % self.window_size]
+        if sent_at is None:
+            return
+        rtt = time.monotonic() - sent_at
+        if self._srtt is None:
+            self._srtt, self._rttvar = rtt, rtt / 2
+        else:
+            self._rttvar += (abs(self._srtt - rtt) - self._rttvar) / 4
+            self._srtt += (rtt - self._srtt) / 8
+        self._rto = min(max(self.timeout, self._srtt + 4 * self._rttvar), settings.MAX_RETRANSMIT_TIMEOUT)
+
+    def _unwrap_seq(self, sequence_num):
+        """Map a 16-bit sequence number from the server onto the running count at or above base_seq_num."""
+        return self.base_seq_num + ((sequence_num - self.base_seq_num) & SEQ_MASK)
 
     def reset_parameters(self):
+        """Restart the sequence space and the RTT estimate for a new connection."""
         self.base_seq_num = 0
         self.next_seq_num = 0
-        self.packet_buffer.clear()
-        self.ack_received.clear()
+        self._srtt = None
+        self._rttvar = 0.0
+        self._rto = self.timeout
+        self._reset_window()
+
+    def _reset_window(self):
+        """Clear per-message sender state; sequence numbers keep running so late duplicates stay recognisable."""
+        self.packet_buffer = [None] * self.window_size
+        self._sent_at = [None] * self.window_size
+        self.ack_bitmap = 0
         self.last_timeout = 0
         self.retry_count = 0  
+        self._ack_deque.clear()
 
     def fragment_message(self, message):
-        """Fragment the message into smaller chunks based on max_fragment_size"""
-        fragments = []
-        for i in range(0, len(message), self.max_fragment_size):
-            fragment = message[i:i + self.max_fragment_size]
-            fragments.append(fragment)
-        return fragments
+        """Encode the message once and split it into zero-copy memoryview chunks of max_fragment_size bytes"""
+        data = message.encode('utf-8')
+        view = memoryview(data)
+        return [view[i:i + self.max_fragment_size] for i in range(0, len(data), self.max_fragment_size)]
 
 
     def process_acks(self):
@@ -159,7 +267,9 @@ class Client(NetworkDevice):
 
     def handle_ack(self, parsed):
         """Process an acknowledgment packet"""
-        ack_seq = parsed.get('sequence', 0)
+        ack_seq = self._unwrap_seq(parsed.get('sequence', 0))
+        if ack_seq >= self.next_seq_num:
+            return
         
         if self.protocol == 'gbn':
             print(CLIENT_LOGS.RECEIVED_ACK.format(ack_seq=ack_seq))
@@ -168,24 +278,23 @@ class Client(NetworkDevice):
                 return
                 
             old_base = self.base_seq_num
+            self._sample_rtt(ack_seq)
+            # Slots below the new base are simply overwritten when next_seq_num reaches them.
             self.base_seq_num = ack_seq + 1
             
-            for seq in range(old_base, self.base_seq_num):
-                if seq in self.packet_buffer:
-                    del self.packet_buffer[seq]
-            
             print(CLIENT_LOGS.WINDOW_MOVED.format(old_base=old_base, old_end=old_base + self.window_size - 1, new_base=self.base_seq_num, new_end=self.base_seq_num + self.window_size - 1))
             return
             
         print(CLIENT_LOGS.RECEIVED_ACK.format(ack_seq=ack_seq))
         
-        self.ack_received.add(ack_seq)
+        if self.is_acked(ack_seq):
+            return
+        self._sample_rtt(ack_seq)
+        self.ack_bitmap |= 1 << (ack_seq - self.base_seq_num)
         
         old_base = self.base_seq_num
-        while self.base_seq_num in self.ack_received:
-            if self.base_seq_num in self.packet_buffer:
-                del self.packet_buffer[self.base_seq_num]
-            
+        while self.ack_bitmap & 1:
+            self.ack_bitmap >>= 1
             self.base_seq_num += 1
         
         if old_base != self.base_seq_num:
@@ -193,87 +302,157 @@ class Client(NetworkDevice):
 
     def handle_nack(self, parsed):
         """Process a negative acknowledgment packet"""
-        nack_seq = parsed.get('sequence', 0)
+        nack_seq = self._unwrap_seq(parsed.get('sequence', 0))
         
         if self.protocol == 'gbn':
             print(CLIENT_LOGS.RECEIVED_NACK.format(nack_seq=nack_seq))
+            if nack_seq != self.base_seq_num:
+                return
+            batch = []
             for seq in range(self.base_seq_num, self.next_seq_num):
-                if seq in self.packet_buffer:
-                    print(CLIENT_LOGS.RESENDING_PACKET.format(seq=seq))
-                    self._socket.sendall(self.packet_buffer[seq])
+                print(CLIENT_LOGS.RESENDING_PACKET.format(seq=seq))
+                batch.append(self.packet_buffer[seq % self.window_size])
+                self._sent_at[seq % self.window_size] = None
+            self.sendmsg_all(self._socket, batch)
             return
             
         print(CLIENT_LOGS.RECEIVED_NACK.format(nack_seq=nack_seq))
         
-        if nack_seq in self.packet_buffer:
+        if self.base_seq_num <= nack_seq < self.next_seq_num and not self.is_acked(nack_seq):
             print(CLIENT_LOGS.RESENDING_PACKET.format(seq=nack_seq))
-            self._socket.sendall(self.packet_buffer[nack_seq])
+            self._sent_at[nack_seq % self.window_size] = None
+            self._socket.sendall(self.packet_buffer[nack_seq % self.window_size])
 
     def disconnect(self):
         """Terminate the connection with the server gracefully"""
         if not self._socket:
             return
         print(CLIENT_LOGS.INIT_DISCONNECT)
-        disconnect_packet = self.create_packet(settings.DISCONNECT_TYPE, "Disconnect")
-        self._socket.sendall(disconnect_packet)
+        self._ack_deque.clear()
+        self.send_packet(self._socket, settings.DISCONNECT_TYPE, "Disconnect")
         print(CLIENT_LOGS.WAIT_DISCONNECT_ACK)
-        self._socket.settimeout(2.0)
-        response_packet = self._socket.recv(self.BUFFER_SIZE)
-        if not response_packet:
-            raise ConnectionError(CLIENT_ERRORS.NO_RESPONSE)
-        print(CLIENT_LOGS.SERVER_DISCONNECT_ACK)
+        response = self._next_response(2.0)
+        self._stop_receiver()
         self._socket.close()
         self.handshake_complete = False
+        if response is None:
+            raise ConnectionError(CLIENT_ERRORS.NO_RESPONSE)
+        print(CLIENT_LOGS.SERVER_DISCONNECT_ACK)
+        print(CLIENT_LOGS.DISCONNECTED)
+
+    def _stop_receiver(self):
+        """Wake the receiver thread through its socketpair, wait for it to exit and release the pair."""
         self._stop_event.set()
+        if self._wakeup_w:
+            try:
+                self._wakeup_w.send(b'\0')
+            except OSError:
+                pass
         if self._receiver_thread and self._receiver_thread.is_alive():
             self._receiver_thread.join(timeout=1.0)
-        print(CLIENT_LOGS.DISCONNECTED)
+        for sock in (self._wakeup_r, self._wakeup_w):
+            if sock:
+                sock.close()
+        self._wakeup_r = self._wakeup_w = None
+
+    def request_nickname(self, name, timeout=0.5):
+        """Ask the server to use name as this client's nickname; the ACK is read by the receiver thread."""
+        self._ack_deque.clear()
+        self.send_packet(self._socket, settings.SET_NICK_TYPE, name)
+        return self._next_response(timeout) is not None
+
+    def list_users(self, timeout=2.0):
+        """Request the connected user list; the receiver thread fulfils the pending future with the response."""
+        future = Future()
+        self._pending_list = future
+        self.send_packet(self._socket, settings.LIST_REQUEST_TYPE, "{}")
+        try:
+            return json_loads(future.result(timeout))
+        except FutureTimeoutError:
+            return None
+        finally:
+            self._pending_list = None
 
     def _receiver_loop(self):
-        """Continuously receive DATA (broadcast) and print to stdout."""
+        """Wait on the socket and the wakeup pair with a selector; print DATA and route ACK/NACK/LIST replies."""
+        rx_buffer = bytearray()
+        chunk = bytearray(settings.READ_BUFFER_SIZE)
+        chunk_view = memoryview(chunk)
+        sock = self._socket
+        wakeup = self._wakeup_r
+        stopped = self._stop_event.is_set
+        extract_packets = self.extract_packets
+        parse_packet = self.parse_packet
+        handle_incoming = self._handle_incoming
+        selector = selectors.DefaultSelector()
+        selector.register(sock, selectors.EVENT_READ)
+        selector.register(wakeup, selectors.EVENT_READ)
         try:
-            while not self._stop_event.is_set():
-                try:
-                    self._socket.settimeout(0.5)
-                    packet = self._socket.recv(self.BUFFER_SIZE)
-                    if not packet:
-                        continue
-                    parsed = self.parse_packet(packet)
-                    if not parsed:
-                        continue
-                    if parsed['type'] == settings.DATA_TYPE:
-                        try:
-                            txt = parsed['payload'].decode('utf-8')
-                        except Exception:
-                            txt = f"<binary {len(parsed['payload'])} bytes>"
-                        print(f"\n[BROADCAST] {txt}")
-                        self._last_messages.append(txt)
-                        from_addr = "_"
-                        content = txt
-                        if txt.startswith('[') and '] ' in txt:
-                            try:
-                                end = txt.index('] ')
-                                from_addr = txt[1:end]
-                                content = txt[end+2:]
-                            except Exception:
-                                pass
-                        bucket = self._reassembly.setdefault(from_addr, [])
-                        bucket.append(content)
-                        if parsed.get('last_packet'):
-                            full = ''.join(bucket)
-                            self._last_full_messages.append(full)
-                            self._reassembly[from_addr] = []
-                    elif parsed['type'] in (settings.ACK_TYPE, settings.NACK_TYPE):
-                        try:
-                            self._ack_queue.put_nowait(parsed)
-                        except Exception:
-                            pass
-                except socket.timeout:
-                    continue
-                except Exception:
-                    continue
+            while not stopped():
+                for key, _ in selector.select():
+                    if key.fileobj is wakeup:
+                        return
+                    try:
+                        received = sock.recv_into(chunk)
+                    except OSError:
+                        return
+                    if not received:
+                        return
+                    rx_buffer += chunk_view[:received]
+                    for packet in extract_packets(rx_buffer):
+                        parsed = parse_packet(packet)
+                        if parsed:
+                            handle_incoming(parsed)
         except Exception:
             pass
+        finally:
+            selector.close()
+
+    def _handle_incoming(self, parsed):
+        """Dispatch one parsed packet received from the server."""
+        ptype = parsed['type']
+        if ptype == DATA_TYPE:
+            payload = parsed['payload']
+            try:
+                txt = payload.decode('utf-8')
+            except Exception:
+                txt = f"<binary {len(payload)} bytes>"
+            sys.stdout.write("\n[BROADCAST] " + txt + "\n")
+            self._last_messages.append(txt)
+            from_addr = "_"
+            content = payload
+            if payload.startswith(b'['):
+                end = payload.find(b'] ')
+                if end != -1:
+                    from_addr = payload[1:end].decode('utf-8', 'replace')
+                    content = payload[end+2:]
+            bucket = self._reassembly_bucket(from_addr)
+            bucket.extend(content)
+            if parsed.get('last_packet'):
+                self._last_full_messages.append(bucket.decode('utf-8', 'replace'))
+                bucket.clear()
+        elif ptype == ACK_TYPE or ptype == NACK_TYPE:
+            self._ack_deque.append(parsed)
+            self._ack_event.set()
+        elif ptype == LIST_RESPONSE_TYPE:
+            future = self._pending_list
+            if future is not None and not future.done():
+                future.set_result(parsed['payload'])
+
+    def _reassembly_bucket(self, from_addr):
+        """Return the sender's reassembly buffer, evicting idle and least-recently-used senders."""
+        now = time.monotonic()
+        while self._reassembly:
+            oldest = next(iter(self._reassembly))
+            if self._reassembly[oldest][0] >= now:
+                break
+            self._reassembly.popitem(last=False)
+        entry = self._reassembly.pop(from_addr, None)
+        bucket = entry[1] if entry else bytearray()
+        self._reassembly[from_addr] = (now + settings.REASSEMBLY_TIMEOUT, bucket)
+        if len(self._reassembly) > settings.MAX_REASSEMBLY_SENDERS:
+            self._reassembly.popitem(last=False)
+        return bucket
 
     def run_chat(self):
         """Simple chat loop: reads lines and sends as message (fragmented)."""
@@ -286,18 +465,15 @@ class Client(NetworkDevice):
                     continue
                 if msg.startswith('/who'):
                     try:
-                        pkt = self.create_packet(settings.LIST_REQUEST_TYPE, "{}")
-                        self._socket.sendall(pkt)
-                        resp = self._socket.recv(self.BUFFER_SIZE)
-                        parsed = self.parse_packet(resp)
-                        if parsed and parsed['type'] == settings.LIST_RESPONSE_TYPE:
-                            try:
-                                names = json.loads(parsed['payload'])
-                                print("[USERS] " + (", ".join(names) if names else "<none>"))
-                            except Exception:
-                                print("[USERS] <parse error>")
+                        try:
+                            names = self.list_users()
+                        except ValueError:
+                            print("[USERS] <parse error>")
                         else:
-                            print("[USERS] no response")
+                            if names is None:
+                                print("[USERS] no response")
+                            else:
+                                print("[USERS] " + (", ".join(names) if names else "<none>"))
                     except Exception as e:
                         print(f"[ERROR] who failed: {e}")
                     continue
@@ -307,16 +483,7 @@ class Client(NetworkDevice):
                         print("[ERROR] usage: /nick <name>")
                         continue
                     try:
-                        pkt = self.create_packet(settings.SET_NICK_TYPE, name)
-                        self._socket.sendall(pkt)
-                        self._socket.settimeout(0.5)
-                        try:
-                            resp = self._socket.recv(self.BUFFER_SIZE)
-                            _ = self.parse_packet(resp)
-                        except Exception:
-                            pass
-                        finally:
-                            self._socket.settimeout(None)
+                        self.request_nickname(name)
                         print(f"[NICK] set to '{name}'")
                     except Exception as e:
                         print(f"[ERROR] nick failed: {e}")
@@ -340,6 +507,7 @@ if __name__ == '__main__':
                             help='Run in interactive UI or simple chat')
 
         args = parser.parse_args()
+        setup_logging()
 
         host = args.host or input("Server host [127.0.0.1]: ").strip() or '127.0.0.1'
         try:
@@ -379,16 +547,7 @@ if __name__ == '__main__':
             try:
                 nick = input("Choose a nickname (optional): ").strip()
                 if nick:
-                    pkt = client.create_packet(settings.SET_NICK_TYPE, nick)
-                    client._socket.sendall(pkt)
-                    client._socket.settimeout(0.5)
-                    try:
-                        resp = client._socket.recv(client.BUFFER_SIZE)
-                        _ = client.parse_packet(resp)
-                    except Exception:
-                        pass
-                    finally:
-                        client._socket.settimeout(None)
+                    client.request_nickname(nick)
             except Exception:
                 pass
             client.run_chat()
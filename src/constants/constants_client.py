@@ -33,6 +33,7 @@ class CLIENT_ERRORS:
     UNEXPECTED_RESPONSE = '[ERROR] Unexpected response from server: {parsed}'
     FAILED_SEND = '[ERROR] Failed to send message: {error}'
     INVALID_INPUT = '[ERROR] Invalid input. Values must be numbers.'
+    INVALID_PARAMS = '[ERROR] Fragment size must be between 1 and {max_fragment_size} and window size between 1 and {max_window_size}.'
     MESSAGE_EMPTY = '[ERROR] Message cannot be empty.'
     FAILED_DISCONNECT = '[ERROR] Failed to disconnect: {error}'
     ERROR_RECEIVING_ACK = '[ERROR] Error receiving ACK: {error}'
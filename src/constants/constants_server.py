@@ -1,6 +1,6 @@
 class SERVER_LOGS:
     START = '[LOG] Server started on {host}:{port}'
-    PROTOCOL = '[LOG] Protocol: {protocol}, Max fragment size: {max_fragment_size} characters'
+    PROTOCOL = '[LOG] Protocol: {protocol}, Max fragment size: {max_fragment_size} bytes'
     WINDOW = '[LOG] Window size: {window_size} packets'
     NEW_CONNECTION = '[LOG] New connection from: {client_address}'
     HANDSHAKE_COMPLETE = '[LOG] Handshake completed with {client_address}'
@@ -18,11 +18,13 @@ class SERVER_LOGS:
 class SERVER_ERRORS:
     INVALID_HEADER = '[ERROR] Invalid header received from {client_address}'
     PARSE_PACKET = '[ERROR] Failed to parse packet from {client_address}'
+    INCOMPATIBLE_HANDSHAKE = '[ERROR] Unsupported handshake version, protocol or sizes from {client_address}'
     EXPECTED_SYN = '[ERROR] Expected SYN but got message type {msg_type}'
     EXPECTED_ACK = '[ERROR] Expected HANDSHAKE_ACK but got message type {msg_type}'
     FAILED_ACK = '[ERROR] Failed to receive ACK from {client_address}'
     ERROR_HANDSHAKE = '[ERROR] Error in handshake with {client_address}: {error}'
     SERVER_ERROR = '[ERROR] Server error: {error}'
+    INVALID_PARAMS = '[ERROR] Fragment size must be between 1 and {max_fragment_size} and window size between 1 and {max_window_size}.'
     INCOMPLETE_HEADER = '[ERROR] Incomplete or missing header from {client_address}'
     UNPACK_HEADER = '[ERROR] Failed to unpack header from {client_address}: {error}'
     INCOMPLETE_PAYLOAD = '[ERROR] Incomplete payload received from {client_address}'
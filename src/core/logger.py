@@ -0,0 +1,78 @@
+import atexit
+import logging
+import os
+import queue
+import sys
+import threading
+from logging.handlers import MemoryHandler, QueueHandler, QueueListener
+
+from src.core import settings
+
+_listener = None
+
+
+class _TimedMemoryHandler(MemoryHandler):
+    """MemoryHandler that also flushes every flush_interval seconds, so a quiet log still reaches the file."""
+
+    def __init__(self, capacity, flush_interval, **kwargs):
+        super().__init__(capacity, **kwargs)
+        self._stop_flushing = threading.Event()
+        self._flusher = threading.Thread(target=self._flush_loop, args=(flush_interval,), name='log-flush', daemon=True)
+        self._flusher.start()
+
+    def _flush_loop(self, flush_interval):
+        while not self._stop_flushing.wait(flush_interval):
+            self.flush()
+
+    def close(self):
+        self._stop_flushing.set()
+        self._flusher.join()
+        super().close()
+
+
+def setup_logging(level=logging.INFO, stream=None):
+    """Route log records through a queue so hot paths only enqueue; a background listener writes them."""
+    global _listener
+    if _listener is not None:
+        return _listener
+    handler = logging.StreamHandler(stream or sys.stdout)
+    handler.setFormatter(logging.Formatter('%(message)s'))
+    log_queue = queue.SimpleQueue()
+    root = logging.getLogger()
+    root.setLevel(level)
+    root.addHandler(QueueHandler(log_queue))
+    _listener = QueueListener(log_queue, handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(_listener.stop)
+    return _listener
+
+
+def setup_file_logger(name, filepath, flush_records=settings.LOG_FLUSH_RECORDS,
+                      flush_interval=settings.LOG_FLUSH_INTERVAL):
+    """Return a logger that appends to filepath through its own queue listener, kept off the console."""
+    os.makedirs(os.path.dirname(filepath), exist_ok=True)
+    file_handler = logging.FileHandler(filepath, encoding='utf-8')
+    file_handler.setFormatter(logging.Formatter('%(message)s'))
+    # Records reach the file in batches of flush_records, at least every flush_interval seconds and
+    # immediately on errors, instead of one write+flush each.
+    handler = _TimedMemoryHandler(flush_records, flush_interval, flushLevel=logging.ERROR, target=file_handler)
+    log_queue = queue.SimpleQueue()
+    logger = logging.getLogger(name)
+    for old in list(logger.handlers):
+        logger.removeHandler(old)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    logger.addHandler(QueueHandler(log_queue))
+    listener = QueueListener(log_queue, handler)
+    listener.start()
+    return logger, listener
+
+
+def stop_file_logger(listener):
+    """Stop a listener from setup_file_logger, writing out buffered records and closing the file."""
+    listener.stop()
+    for handler in listener.handlers:
+        target = getattr(handler, 'target', None)
+        handler.close()
+        if target is not None:
+            target.close()
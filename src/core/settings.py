@@ -13,4 +13,17 @@ SR = 1
 ERROR_CODE = 99
 
 MAX_RETRIES = 5
-DEFAULT_PORT = 5001 
\ No newline at end of file
+MAX_RETRANSMIT_TIMEOUT = 30.0
+DEFAULT_PORT = 5001 
+THREAD_CACHE_SIZE = 64
+WRITER_BATCH_SIZE = 100
+SEND_TIMEOUT = 2.0
+SENDQ_LIMIT = 4 * 1024 * 1024
+
+READ_BUFFER_SIZE = 65536
+SOCKET_BUFFER_SIZE = 65536
+LOG_FLUSH_RECORDS = 1000
+LOG_FLUSH_INTERVAL = 1.0
+
+MAX_REASSEMBLY_SENDERS = 64
+REASSEMBLY_TIMEOUT = 30.0
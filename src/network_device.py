@@ -1,11 +1,114 @@
 import socket
+import logging
 import struct
-import hashlib
 import random
 import time
+from contextlib import nullcontext
+from typing import NamedTuple, Optional
+from zlib import crc32
 from src.core import settings
+from src.constants.constants_server import SERVER_LOGS
 import json
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+if orjson is not None:
+    def json_dumps(obj) -> bytes:
+        """Serialize obj straight to JSON bytes (orjson, no intermediate str)"""
+        return orjson.dumps(obj)
+
+    def json_loads(data):
+        """Deserialize JSON from bytes without decoding to str first"""
+        return orjson.loads(data)
+else:
+    def json_dumps(obj) -> bytes:
+        """Serialize obj to UTF-8 JSON bytes (stdlib fallback)"""
+        return json.dumps(obj).encode('utf-8')
+
+    def json_loads(data):
+        """Deserialize JSON from bytes (stdlib fallback)"""
+        return json.loads(data)
+
+
+log = logging.getLogger(__name__)
+
+# Returned by write_lock when nothing else writes to the socket.
+_NO_WRITE_LOCK = nullcontext()
+
+# payload_length, message_type, sequence_num, checksum, last_packet
+PACKET_HEADER = struct.Struct('!IBH4sB')
+# DATA sequence numbers keep counting across messages and wrap at the 16-bit header field,
+# so a late retransmission from an earlier message is never taken for a fragment of the next one.
+SEQ_SPACE = 1 << 16
+SEQ_MASK = SEQ_SPACE - 1
+# ACK/NACK packets carry no payload; only the header fields matter to the peer.
+EMPTY_CHECKSUM = crc32(b'').to_bytes(4, 'big')
+
+# SYN / SYN-ACK / handshake ACK payload: version, max_fragment_size, window_size, protocol, status, session_id
+HANDSHAKE_FRAME = struct.Struct('!BHHBB8s')
+HANDSHAKE_VERSION = 1
+HANDSHAKE_OK = 0
+# Largest fragment size the frame's unsigned 16-bit field can carry.
+HANDSHAKE_FIELD_MAX = 0xFFFF
+# Largest window for which a wrapped sequence number still tells old fragments from new ones.
+MAX_WINDOW_SIZE = SEQ_SPACE // 2
+PROTOCOL_CODES = {'gbn': settings.GBN, 'sr': settings.SR}
+PROTOCOL_NAMES = {code: name for name, code in PROTOCOL_CODES.items()}
+
+
+class Handshake(NamedTuple):
+    """Decoded handshake frame; protocol is 'gbn'/'sr' and session_id a str."""
+    version: int
+    max_fragment_size: int
+    window_size: int
+    protocol: str
+    status: int
+    session_id: str
+
+
+def handshake_params_valid(max_fragment_size, window_size) -> bool:
+    """Whether the fragment size fits the handshake frame and the window fits the sequence space."""
+    return 1 <= max_fragment_size <= HANDSHAKE_FIELD_MAX and 1 <= window_size <= MAX_WINDOW_SIZE
+
+
+def pack_handshake(protocol, max_fragment_size, window_size, status=HANDSHAKE_OK, session_id='') -> bytes:
+    """Encode handshake parameters as a fixed-size binary frame; sizes must pass handshake_params_valid."""
+    if protocol not in PROTOCOL_CODES:
+        raise ValueError(f"unknown protocol {protocol!r}")
+    return HANDSHAKE_FRAME.pack(HANDSHAKE_VERSION, max_fragment_size, window_size,
+                                PROTOCOL_CODES[protocol], status,
+                                (session_id or '').encode('ascii'))
+
+
+def unpack_handshake(payload) -> Optional[Handshake]:
+    """Decode a handshake frame, or return None if it is malformed or from an incompatible peer."""
+    if len(payload) != HANDSHAKE_FRAME.size:
+        return None
+    version, max_fragment_size, window_size, protocol, status, session_id = HANDSHAKE_FRAME.unpack(payload)
+    if (version != HANDSHAKE_VERSION or protocol not in PROTOCOL_NAMES
+            or not handshake_params_valid(max_fragment_size, window_size)):
+        return None
+    return Handshake(version, max_fragment_size, window_size, PROTOCOL_NAMES[protocol], status,
+                     session_id.rstrip(b'\0').decode('ascii'))
+
+
+class ReceiveState:
+    """Per-connection receiver state shared by the packet handlers."""
+    __slots__ = ('protocol', 'window_size', 'expected_seq', 'out_of_order', 'fragments', 'attempts')
+
+    def __init__(self, protocol, window_size):
+        self.protocol = protocol
+        self.window_size = window_size
+        self.expected_seq = 0
+        self.out_of_order = {}
+        self.fragments = bytearray()
+        self.attempts = 0
+
+
 class NetworkDevice:
     def __init__(self, server_addr:str, server_port:int, protocol='gbn', max_fragment_size=3, window_size=4):
 
@@ -33,212 +136,383 @@ class NetworkDevice:
         self.corruption_probability = 0.0
         self.delay_probability = 0.0
         self.delay_time = 0.0
+        # Private generator for the channel simulation, independent of the module-level random state.
+        self._rng = random.Random()
 
         self._socket = None  
-    def create_packet(self, message_type, payload, sequence_num=0, last_packet=False):
-        """Create a packet with header and payload, including last_packet flag as 1 byte."""
-        if isinstance(payload, str):
-            payload = payload.encode('utf-8')
+
+        # Channel function picked once per configuration by set_channel_conditions.
+        self.simulate_channel = self._clear_channel
+        # Set in 100% loss/corruption modes: NACK straight away without simulating or checksumming.
+        self._fast_nack = None
+        self.simulate_delay = self._no_delay
+
+        # Packets handled before the simulated channel vs. after it (loss/corruption applies to the latter).
+        self._control_handlers = {
+            settings.ERROR_CODE: self._on_config,
+            settings.SET_NICK_TYPE: self._on_set_nick,
+            settings.LIST_REQUEST_TYPE: self._on_list,
+        }
+        self._channel_handlers = {
+            settings.DATA_TYPE: self._on_data,
+            settings.DISCONNECT_TYPE: self._on_disconnect,
+        }
+
+    def create_header(self, message_type, payload: bytes, sequence_num=0, last_packet=False):
+        """Build the packet header for an already-encoded payload."""
         payload_length = len(payload)
-        
         checksum = self.calculate_checksum(payload)
+        return PACKET_HEADER.pack(payload_length, message_type, sequence_num, checksum, int(last_packet))
 
-        header = struct.pack('!IBH4sB', payload_length, message_type, sequence_num, checksum, int(last_packet))
-        return header + payload
+    def create_header_for(self, message_type, buffers, sequence_num=0, last_packet=False):
+        """Build the header for a payload split across several buffers, checksummed without joining them."""
+        checksum = 0
+        payload_length = 0
+        for buf in buffers:
+            checksum = crc32(buf, checksum)
+            payload_length += len(buf)
+        return PACKET_HEADER.pack(payload_length, message_type, sequence_num, checksum.to_bytes(4, 'big'), int(last_packet))
+
+    def create_packet(self, message_type, payload, sequence_num=0, last_packet=False):
+        """Create a packet with header and payload (str or any bytes-like object, e.g. a memoryview)."""
+        if isinstance(payload, str):
+            payload = payload.encode('utf-8')
+        header_size = PACKET_HEADER.size
+        packet = bytearray(header_size + len(payload))
+        PACKET_HEADER.pack_into(packet, 0, len(payload), message_type, sequence_num, self.calculate_checksum(payload), int(last_packet))
+        packet[header_size:] = payload
+        return packet
+
+    def send_packet(self, sock: socket.socket, message_type, payload, sequence_num=0, last_packet=False):
+        """Send header and payload as separate buffers in one vectored write (no concatenation)."""
+        if isinstance(payload, str):
+            payload = payload.encode('utf-8')
+        header = self.create_header(message_type, payload, sequence_num, last_packet)
+        with self.write_lock(sock):
+            self.sendmsg_all(sock, [header, payload])
+
+    def send_ack(self, sock: socket.socket, sequence_num, message_type=settings.ACK_TYPE):
+        """Send a payload-less ACK/NACK: only the header, carrying the precomputed empty-payload checksum."""
+        header = PACKET_HEADER.pack(0, message_type, sequence_num, EMPTY_CHECKSUM, 0)
+        with self.write_lock(sock):
+            sock.sendall(header)
+
+    def write_lock(self, sock: socket.socket):
+        """Context manager serialising whole-packet writes to sock (no-op unless a subclass writes from several threads)."""
+        return _NO_WRITE_LOCK
+
+    @staticmethod
+    def configure_socket(sock: socket.socket, nodelay=True, sndbuf=settings.SOCKET_BUFFER_SIZE):
+        """Tune a socket: disable Nagle so tiny fragments/ACKs are not delayed, size the kernel buffers for a full window and enable keepalive."""
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, int(nodelay))
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, sndbuf)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, settings.SOCKET_BUFFER_SIZE)
+        # Let the kernel detect peers that vanished without a FIN, so their worker is not parked forever.
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+
+    @staticmethod
+    def sendmsg_all(sock: socket.socket, buffers, timeout=None):
+        """Write all buffers with sendmsg (writev), resuming after partial writes; raise TimeoutError past timeout seconds."""
+        if not hasattr(sock, 'sendmsg'):
+            sock.sendall(b''.join(buffers))
+            return
+        deadline = None if timeout is None else time.monotonic() + timeout
+        views = [memoryview(buf) for buf in buffers if len(buf)]
+        index = 0
+        while index < len(views):
+            if deadline is not None and time.monotonic() > deadline:
+                raise TimeoutError(f"send not completed within {timeout}s")
+            sent = sock.sendmsg(views[index:])
+            while index < len(views) and sent >= len(views[index]):
+                sent -= len(views[index])
+                index += 1
+            if sent:
+                views[index] = views[index][sent:]
 
     def calculate_checksum(self, data):
-        """Calculate a checksum for the given data (used only for received packets)."""
+        """Calculate the 4-byte CRC32 checksum of the given data."""
         if isinstance(data, str):
             data = data.encode('utf-8')
-        return hashlib.md5(data).digest()[:4]
+        return crc32(data).to_bytes(4, 'big')
     
     def handle_packet(self, data_type, payload: str):
         """Create and send a packet with the given data type and payload"""
-        data_packet = self.create_packet(data_type, payload)
-        self._socket.sendall(data_packet)
+        self.send_packet(self._socket, data_type, payload)
+
+
+    @staticmethod
+    def _clear_channel(data, packet_index=0):
+        """Deliver the payload untouched (normal mode: no probabilities to roll)."""
+        return data
+
+    @staticmethod
+    def _no_delay():
+        """No per-packet delay outside 100% delay mode."""
+
+    def remove_session(self, client_address: str):
+        """Forget a client's session once its receive loop ends."""
+        self.client_sessions.pop(client_address, None)
 
+    def broadcast_to_others(self, from_address: str, payload: bytes):
+        """Deliver a reassembled message to the other peers (no-op unless a subclass relays messages)."""
 
-    def simulate_channel(self, data, packet_index=0):
+    def set_nickname(self, client_address: str, nickname: str):
+        """Record a peer's nickname (no-op unless a subclass tracks peers)."""
+
+    def list_connected(self):
+        """Names of the connected peers (empty unless a subclass tracks peers)."""
+        return []
+
+    def _noisy_channel(self, data, packet_index=0):
         """
         Simulate channel conditions (loss, corruption, delay) based on probabilities.
         """
-        if self.loss_probability == 1.0 or (self.loss_probability > 0.0 and random.random() < self.loss_probability):
-            print(f"[CHANNEL] Packet lost in transmission (seq={packet_index})!")
+        if self.loss_probability == 1.0 or (self.loss_probability > 0.0 and self._rng.random() < self.loss_probability):
+            log.debug("[CHANNEL] Packet lost in transmission (seq=%s)!", packet_index)
             return None
 
-        if self.corruption_probability == 1.0 or (self.corruption_probability > 0.0 and random.random() < self.corruption_probability):
-            print(f"[CHANNEL] Packet corrupted during transmission (seq={packet_index})!")
+        if self.corruption_probability == 1.0 or (self.corruption_probability > 0.0 and self._rng.random() < self.corruption_probability):
+            log.debug("[CHANNEL] Packet corrupted during transmission (seq=%s)!", packet_index)
             data = bytearray(data)
-            index = random.randint(0, len(data) - 1) if len(data) > 0 else 0
-            data[index] = (data[index] + 1) % 256 
+            if data:
+                data[self._rng.randrange(len(data))] ^= 0x01
             return bytes(data)
 
-        if self.delay_probability == 1.0 or (self.delay_probability > 0.0 and random.random() < self.delay_probability):
+        if self.delay_probability == 1.0 or (self.delay_probability > 0.0 and self._rng.random() < self.delay_probability):
             delay = self.delay_time
-            print(f"[CHANNEL] Packet delayed by {delay:.2f} seconds (seq={packet_index})")
+            log.debug("[CHANNEL] Packet delayed by %.2f seconds (seq=%s)", delay, packet_index)
             time.sleep(delay)
 
         return data
 
-    def handle_client_messages(self, client_socket: socket.socket, client_address: str):
-        """Continuously receive and process messages from a connected client."""
-        received_fragments = []  
-        attempts = 0
+    def read_packet(self, rfile):
+        """Read one complete packet (header + payload) from a buffered socket reader."""
+        header = rfile.read(self.HEADER_SIZE + 1)
+        if len(header) < self.HEADER_SIZE + 1:
+            return None
+        payload_length = PACKET_HEADER.unpack_from(header)[0]
+        payload = rfile.read(payload_length)
+        if len(payload) < payload_length:
+            return None
+        return header + payload
+
+    def extract_packets(self, buffer: bytearray):
+        """Split every complete packet off the front of a stream receive buffer, keeping the remainder."""
+        header_size = self.HEADER_SIZE + 1
+        packets = []
+        offset = 0
+        while len(buffer) - offset >= header_size:
+            payload_length = PACKET_HEADER.unpack_from(buffer, offset)[0]
+            end = offset + header_size + payload_length
+            if len(buffer) < end:
+                break
+            packets.append(bytes(buffer[offset:end]))
+            offset = end
+        del buffer[:offset]
+        return packets
+
+    def handle_client_messages(self, client_socket: socket.socket, client_address: str, rfile=None):
+        """Continuously receive and process messages from a connected client (buffered reads, raw-socket writes)."""
+        owns_rfile = rfile is None
+        if owns_rfile:
+            rfile = client_socket.makefile('rb', buffering=settings.READ_BUFFER_SIZE)
+        session = self.client_sessions.get(client_address)
+        state = ReceiveState(getattr(session, 'protocol', None) or self.protocol,
+                             getattr(session, 'window_size', None) or self.window_size)
+        control_handlers = self._control_handlers
+        channel_handlers = self._channel_handlers
+        # One header buffer per connection, refilled in place for every packet.
+        header_size = self.HEADER_SIZE + 1
+        header = bytearray(header_size)
+        readinto = rfile.readinto
         while client_address in self.client_sessions:
             try:
 
-                if attempts > settings.MAX_RETRIES:
-                    print("[ERROR] Max attempts number reached, ending program execution...")
+                if state.attempts > settings.MAX_RETRIES:
+                    log.error("[ERROR] Max attempts number reached, ending program execution...")
                     break
 
-                header = client_socket.recv(self.HEADER_SIZE + 1) 
-                if not header or len(header) < self.HEADER_SIZE + 1:
-                    print(f"[ERROR] Incomplete or missing header from {client_address}")
+                if readinto(header) < header_size:
+                    log.error("[ERROR] Incomplete or missing header from %s", client_address)
                     break
 
                 try:
-                    payload_length, message_type, sequence_num, checksum, last_packet = struct.unpack('!IBH4sB', header)
+                    payload_length, message_type, sequence_num, checksum, last_packet = PACKET_HEADER.unpack_from(header)
                 except struct.error as e:
-                    print(f"[ERROR] Failed to unpack header from {client_address}: {e}")
+                    log.error("[ERROR] Failed to unpack header from %s: %s", client_address, e)
                     break
 
-                payload = client_socket.recv(payload_length)
+                payload = rfile.read(payload_length)
                 if len(payload) < payload_length:
-                    print(f"[ERROR] Incomplete payload received from {client_address}")
+                    log.error("[ERROR] Incomplete payload received from %s", client_address)
                     break
 
-                if message_type == settings.ERROR_CODE:
-                    try:
-                        config = json.loads(payload.decode('utf-8'))
-                        print(f"[CONFIG] Received channel config from client: {config}")
-                        self.set_channel_conditions(
-                            loss_prob=float(config.get('loss_prob', 0.0)),
-                            corruption_prob=float(config.get('corruption_prob', 0.0)),
-                            delay_prob=float(config.get('delay_prob', 0.0)),
-                            delay_time=float(config.get('delay_time', 0.0))
-                        )
-                        print("[CONFIG] Channel conditions updated on server.")
-                    except Exception as e:
-                        print(f"[ERROR] Failed to parse channel config: {e}")
-                    continue
-
-                if message_type == settings.ERROR_CODE:
-                    continue
-
-                if message_type == settings.SET_NICK_TYPE:
-                    try:
-                        nickname = payload.decode('utf-8').strip()
-                        if hasattr(self, 'set_nickname') and callable(getattr(self, 'set_nickname')):
-                            self.set_nickname(client_address, nickname)  
-                        ack = self.create_packet(settings.ACK_TYPE, f"NICK OK: {nickname}")
-                        client_socket.sendall(ack)
-                    except Exception as e:
-                        print(f"[ERROR] Failed to set nickname: {e}")
+                handler = control_handlers.get(message_type)
+                if handler is not None:
+                    handler(client_socket, client_address, payload)
                     continue
 
-                if message_type == settings.LIST_REQUEST_TYPE:
-                    try:
-                        names = []
-                        if hasattr(self, 'list_connected') and callable(getattr(self, 'list_connected')):
-                            names = self.list_connected() 
-                        resp = json.dumps(names)
-                        pkt = self.create_packet(settings.LIST_RESPONSE_TYPE, resp)
-                        client_socket.sendall(pkt)
-                    except Exception as e:
-                        print(f"[ERROR] Failed to send list: {e}")
+                fast_nack = self._fast_nack
+                if fast_nack is not None:
+                    fast_nack(client_socket, sequence_num, payload)
+                    if sequence_num == state.expected_seq:
+                        state.attempts += 1
                     continue
 
                 processed_payload = self.simulate_channel(payload, sequence_num)
                 
                 if processed_payload is None:
-                    print(f"[CHANNEL] Packet from {client_address} lost in simulated channel.")
-                    if hasattr(self, 'simulate_loss_and_nack'):
-                        self.simulate_loss_and_nack(client_socket, sequence_num)
-                        attempts+=1
+                    log.debug("[CHANNEL] Packet from %s lost in simulated channel.", client_address)
                     continue
 
                 calculated_checksum = self.calculate_checksum(processed_payload)
                 if calculated_checksum != checksum:
-                    print(f"[ERROR] Checksum mismatch for packet {sequence_num} from {client_address}")
-                    if hasattr(self, 'simulate_corruption_and_nack'):
-                        self.simulate_corruption_and_nack(client_socket, sequence_num, payload)
-                        attempts+=1
+                    log.error("[ERROR] Checksum mismatch for packet %s from %s", sequence_num, client_address)
                     continue
 
-                if message_type == settings.DATA_TYPE:
-                    try:
-                        decoded_message = payload.decode('utf-8')
-                        print(f"[LOG] Received message fragment from {client_address}: {decoded_message}")
-                        received_fragments.append(decoded_message)
-                    except Exception:
-                        print(f"[LOG] Received binary data from {client_address}: {len(payload)} bytes")
-                        received_fragments.append(payload)
-                    ack_packet = self.create_packet(settings.ACK_TYPE, f"ACK for seq {sequence_num}", sequence_num=sequence_num)
-                    client_socket.sendall(ack_packet)
-                    print(f"[LOG] Sent ACK for sequence {sequence_num}")
-                    attempts = 0
-
-                    if last_packet:
-                        if all(isinstance(frag, str) for frag in received_fragments):
-                            full_message = ''.join(received_fragments)
-                            print(f"[RECONSTRUCTED] Full message from {client_address}: {full_message}")
-                            if hasattr(self, 'broadcast_to_others') and callable(getattr(self, 'broadcast_to_others')):
-                                try:
-                                    self.broadcast_to_others(client_address, full_message.encode('utf-8')) 
-                                except Exception as e:
-                                    print(f"[ERROR] Broadcast failed: {e}")
-                        else:
-                            print(f"[RECONSTRUCTED] Received binary fragments from {client_address} (not shown as text)")
-
-                        received_fragments = []
-
-                elif message_type == settings.DISCONNECT_TYPE:
-                    if self.handle_disconnect(client_socket, client_address):
-                        print(f"[LOG] Client {client_address} disconnected successfully.")
-                        break
-
-                else:
-                    print(f"[ERROR] Unknown message type {message_type} from {client_address}")
+                handler = channel_handlers.get(message_type)
+                if handler is None:
+                    log.error("[ERROR] Unknown message type %s from %s", message_type, client_address)
+                elif handler(client_socket, client_address, state, sequence_num, payload, last_packet):
+                    break
 
-                if hasattr(self, 'simulate_delay'):
-                    self.simulate_delay()
+                self.simulate_delay()
 
             except Exception as e:
-                print(f"[ERROR] Error handling messages from {client_address}: {e}")
+                log.error("[ERROR] Error handling messages from %s: %s", client_address, e)
                 break
 
 
 
-        if client_address in self.client_sessions:
-            del self.client_sessions[client_address]
+        self.remove_session(client_address)
 
         try:
+            if owns_rfile:
+                rfile.close()
             client_socket.close()
-            print(f"[LOG] Connection with {client_address} closed.")
+            log.info("[LOG] Connection with %s closed.", client_address)
         except Exception as e:
-            print(f"[ERROR] Failed to close connection with {client_address}: {e}")
+            log.error("[ERROR] Failed to close connection with %s: %s", client_address, e)
         
+    def _on_config(self, client_socket, client_address, payload):
+        """Apply channel simulation settings sent by a client."""
+        try:
+            config = json_loads(payload)
+            log.info("[CONFIG] Received channel config from client: %s", config)
+            self.set_channel_conditions(
+                loss_prob=float(config.get('loss_prob', 0.0)),
+                corruption_prob=float(config.get('corruption_prob', 0.0)),
+                delay_prob=float(config.get('delay_prob', 0.0)),
+                delay_time=float(config.get('delay_time', 0.0))
+            )
+            log.info("[CONFIG] Channel conditions updated on server.")
+        except Exception as e:
+            log.error("[ERROR] Failed to parse channel config: %s", e)
+
+    def _on_set_nick(self, client_socket, client_address, payload):
+        """Store the client's nickname and acknowledge it."""
+        try:
+            nickname = payload.decode('utf-8').strip()
+            self.set_nickname(client_address, nickname)
+            self.send_packet(client_socket, settings.ACK_TYPE, f"NICK OK: {nickname}")
+        except Exception as e:
+            log.error("[ERROR] Failed to set nickname: %s", e)
+
+    def _on_list(self, client_socket, client_address, payload):
+        """Reply with the list of connected users."""
+        try:
+            resp = json_dumps(self.list_connected())
+            self.send_packet(client_socket, settings.LIST_RESPONSE_TYPE, resp)
+        except Exception as e:
+            log.error("[ERROR] Failed to send list: %s", e)
+
+    def _on_data(self, client_socket, client_address, state, sequence_num, payload, last_packet):
+        """ACK a DATA fragment per GBN/SR rules and broadcast the message once its last fragment is in order."""
+        expected_seq = state.expected_seq
+        window_size = state.window_size
+        out_of_order = state.out_of_order
+        if state.protocol == 'sr':
+            offset = (sequence_num - expected_seq) & SEQ_MASK
+            in_window = offset < window_size
+            # Up to a window behind expected_seq is a retransmission of a fragment already taken; ACK it again.
+            if in_window or offset >= SEQ_SPACE - window_size:
+                self.send_ack(client_socket, sequence_num)
+                log.debug("[LOG] Sent ACK for sequence %s", sequence_num)
+            if not in_window:
+                return False
+            out_of_order[sequence_num] = (payload, last_packet)
+            ready = []
+            while expected_seq in out_of_order:
+                ready.append(out_of_order.pop(expected_seq))
+                expected_seq = (expected_seq + 1) & SEQ_MASK
+            if log.isEnabledFor(logging.DEBUG):
+                log.debug(SERVER_LOGS.WINDOW_SR.format(start=expected_seq, end=expected_seq + window_size - 1))
+                if out_of_order:
+                    log.debug(SERVER_LOGS.WINDOW_BUFFERED.format(buffered=sorted(out_of_order)))
+        else:
+            if sequence_num != expected_seq:
+                log.debug("[LOG] Discarding out-of-order packet %s (expected %s)", sequence_num, expected_seq)
+                # Before the first fragment this ACKs SEQ_MASK, which the sender ignores as outside its window.
+                self.send_ack(client_socket, (expected_seq - 1) & SEQ_MASK)
+                return False
+            self.send_ack(client_socket, sequence_num)
+            log.debug("[LOG] Sent ACK for sequence %s", sequence_num)
+            ready = [(payload, last_packet)]
+            expected_seq = (expected_seq + 1) & SEQ_MASK
+            if log.isEnabledFor(logging.DEBUG):
+                log.debug(SERVER_LOGS.WINDOW_GBN.format(start=expected_seq, end=expected_seq + window_size - 1))
+        state.expected_seq = expected_seq
+        state.attempts = 0
+
+        for fragment, is_last in ready:
+            # Fragments are byte slices and may split a multi-byte character,
+            # so reassemble raw bytes and decode only the complete message.
+            log.debug("[LOG] Received message fragment from %s: %s bytes", client_address, len(fragment))
+            state.fragments += fragment
+
+            if is_last:
+                try:
+                    full_message = state.fragments.decode('utf-8')
+                except UnicodeDecodeError:
+                    log.info("[RECONSTRUCTED] Received binary fragments from %s (not shown as text)", client_address)
+                else:
+                    log.info("[RECONSTRUCTED] Full message from %s: %s", client_address, full_message)
+                    try:
+                        self.broadcast_to_others(client_address, bytes(state.fragments))
+                    except Exception as e:
+                        log.error("[ERROR] Broadcast failed: %s", e)
+
+                state.fragments = bytearray()
+        return False
+
+    def _on_disconnect(self, client_socket, client_address, state, sequence_num, payload, last_packet):
+        """ACK a disconnect request; returning True ends the receive loop."""
+        if self.handle_disconnect(client_socket, client_address):
+            log.info("[LOG] Client %s disconnected successfully.", client_address)
+            return True
+        return False
+
     def parse_packet(self, packet):
-        """Parse a received packet into its components"""
+        """Parse a received packet (bytes, bytearray or memoryview) into its components"""
         header_size = self.HEADER_SIZE + 1 
         if len(packet) < header_size:
-            print(f"[ERROR] Received packet too small: {len(packet)} bytes, expected at least {header_size} bytes")
+            log.error("[ERROR] Received packet too small: %s bytes, expected at least %s bytes", len(packet), header_size)
             return None
         
-        header = packet[:header_size]
-        
-        payload_length, message_type, sequence_num, checksum, last_packet = struct.unpack('!IBH4sB', header)
+        payload_length, message_type, sequence_num, checksum, last_packet = PACKET_HEADER.unpack_from(packet)
         
         if len(packet) < header_size + payload_length:
-            print(f"[ERROR] Incomplete packet: expected {header_size + payload_length} bytes, got {len(packet)} bytes")
+            log.error("[ERROR] Incomplete packet: expected %s bytes, got %s bytes", header_size + payload_length, len(packet))
             return None
         
-        payload = packet[header_size:header_size+payload_length]
+        payload = memoryview(packet)[header_size:header_size+payload_length]
         
         calculated_checksum = self.calculate_checksum(payload)
         if calculated_checksum != checksum:
-            print("[ERROR] Checksum verification failed!")
+            log.error("[ERROR] Checksum verification failed!")
             return None
+        # Copy the payload out only once it is known to be valid.
+        payload = bytes(payload)
             
         return {
             'type': message_type,
@@ -254,59 +528,57 @@ class NetworkDevice:
         self.corruption_probability = max(0.0, min(1.0, corruption_prob))
         self.delay_probability = max(0.0, min(1.0, delay_prob))
         self.delay_time = max(0.0, delay_time)
+        # Drop whatever the previous configuration installed, so its handlers do not linger.
+        self._fast_nack = None
+        self.simulate_delay = self._no_delay
         
         if self.loss_probability == 1.0:
             mode = "Packet Loss"
-            print("[CONFIG] Simulating 100% packet loss. All packets will be dropped.")
+            log.info("[CONFIG] Simulating 100% packet loss. All packets will be dropped.")
             
-            def simulate_loss_and_nack(client_socket, sequence_num):
-                print(f"[CHANNEL] Simulating packet loss for sequence {sequence_num}")
-                nack_packet = self.create_packet(settings.NACK_TYPE, f"NACK for seq {sequence_num}", sequence_num=sequence_num)
-                client_socket.sendall(nack_packet)
-                print(f"[LOG] Sent NACK for sequence {sequence_num}")
+            def simulate_loss_and_nack(client_socket, sequence_num, payload):
+                log.debug("[CHANNEL] Simulating packet loss for sequence %s", sequence_num)
+                self.send_ack(client_socket, sequence_num, settings.NACK_TYPE)
+                log.debug("[LOG] Sent NACK for sequence %s", sequence_num)
             
-            self.simulate_loss_and_nack = simulate_loss_and_nack  
+            self._fast_nack = simulate_loss_and_nack
 
         elif self.corruption_probability == 1.0:
             mode = "Packet Corruption"
-            print("[CONFIG] Simulating 100% packet corruption. All packets will be corrupted.")
+            log.info("[CONFIG] Simulating 100% packet corruption. All packets will be corrupted.")
             
             def simulate_corruption_and_nack(client_socket, sequence_num, payload):
-                print(f"[CHANNEL] Simulating packet corruption for sequence {sequence_num}")
-                corrupted_payload = bytearray(payload)
-                if len(corrupted_payload) > 0:
-                    corrupted_payload[0] = (corrupted_payload[0] + 1) % 256 
-                nack_packet = self.create_packet(settings.NACK_TYPE, f"NACK for seq {sequence_num}", sequence_num=sequence_num)
-                client_socket.sendall(nack_packet)
-                print(f"[LOG] Sent NACK for sequence {sequence_num}")
+                log.debug("[CHANNEL] Simulating packet corruption for sequence %s", sequence_num)
+                self.send_ack(client_socket, sequence_num, settings.NACK_TYPE)
+                log.debug("[LOG] Sent NACK for sequence %s", sequence_num)
             
-            self.simulate_corruption_and_nack = simulate_corruption_and_nack  
+            self._fast_nack = simulate_corruption_and_nack
 
         elif self.delay_probability == 1.0:
             mode = "Network Delay"
-            print(f"[CONFIG] Simulating 100% network delay. All packets will be delayed by {self.delay_time:.2f} seconds.")
+            log.info("[CONFIG] Simulating 100%% network delay. All packets will be delayed by %.2f seconds.", self.delay_time)
             
             def simulate_delay():
-                print(f"[CHANNEL] Simulating network delay of {self.delay_time:.2f} seconds.")
+                log.debug("[CHANNEL] Simulating network delay of %.2f seconds.", self.delay_time)
                 time.sleep(self.delay_time)
             
             self.simulate_delay = simulate_delay  
         elif self.loss_probability == 0.0 and self.corruption_probability == 0.0 and self.delay_probability == 0.0:
             mode = "Normal"
-            print("[CONFIG] Normal mode. No packet loss, corruption, or delay.")
+            log.info("[CONFIG] Normal mode. No packet loss, corruption, or delay.")
         else:
             mode = "Custom"
-            print(f"[CONFIG] Custom mode: loss={self.loss_probability}, corruption={self.corruption_probability}, delay={self.delay_probability}, delay_time={self.delay_time}s")
+            log.info("[CONFIG] Custom mode: loss=%s, corruption=%s, delay=%s, delay_time=%ss", self.loss_probability, self.corruption_probability, self.delay_probability, self.delay_time)
 
-        print(f"[CONFIG] Channel set to {mode} mode.")
+        self.simulate_channel = self._clear_channel if mode == "Normal" else self._noisy_channel
+        log.info("[CONFIG] Channel set to %s mode.", mode)
 
     def handle_disconnect(self, client_socket: socket.socket, client_address: str) -> bool:
         """Handle client disconnect: send ACK and cleanup."""
         try:
-            ack_packet = self.create_packet(settings.ACK_TYPE, "Disconnect ACK")
-            client_socket.sendall(ack_packet)
+            self.send_packet(client_socket, settings.ACK_TYPE, "Disconnect ACK")
         except Exception as e:
-            print(f"[ERROR] Failed to ACK disconnect for {client_address}: {e}")
+            log.error("[ERROR] Failed to ACK disconnect for %s: %s", client_address, e)
         return True
 
     def update_simulation_params(self, loss_prob=0.0, corruption_prob=0.0, delay_prob=0.0, delay_time=0.0):
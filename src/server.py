@@ -1,99 +1,138 @@
 import socket
-import hashlib
+import logging
+import secrets
 import argparse
-import json
 import threading
-import multiprocessing as mp
+import selectors
 import os
+import struct
+import sys
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List, Tuple
 
-from src.network_device import NetworkDevice
+from src.network_device import (NetworkDevice, pack_handshake, unpack_handshake, handshake_params_valid,
+                                HANDSHAKE_FIELD_MAX, MAX_WINDOW_SIZE)
 from src.core import settings
 from src.constants.constants_server import SERVER_LOGS, SERVER_ERRORS
 from src.core.settings import DEFAULT_PORT
+from src.core.logger import setup_logging, setup_file_logger, stop_file_logger
 
-def _log_worker(queue: "mp.Queue[str]", filepath: str):
-    """Processo separado para registrar logs em arquivo (demonstra IPC)."""
-    os.makedirs(os.path.dirname(filepath), exist_ok=True)
-    with open(filepath, 'a', encoding='utf-8') as f:
-        while True:
-            msg = queue.get()
-            if msg == "__STOP__":
-                break
-            f.write(msg + "\n")
-            f.flush()
+log = logging.getLogger(__name__)
+
+
+class Session:
+    """Per-client state; slotted so each live connection costs a few attributes instead of a dict."""
+    __slots__ = ('protocol', 'max_fragment_size', 'window_size', 'session_id',
+                 'handshake_complete', 'socket', 'expected_seq_num', 'nickname', 'prefix',
+                 'sendq', 'queued_bytes', 'send_lock', 'closed')
+
+    def __init__(self, sock=None, protocol=None, max_fragment_size=None, window_size=None,
+                 session_id=None, handshake_complete=False, expected_seq_num=0, nickname=None, prefix=b''):
+        self.protocol = protocol
+        self.max_fragment_size = max_fragment_size
+        self.window_size = window_size
+        self.session_id = session_id
+        self.handshake_complete = handshake_complete
+        self.socket = sock
+        self.expected_seq_num = expected_seq_num
+        self.nickname = nickname
+        # Encoded "[sender] " label prepended to this client's broadcasts; rebuilt only when the name changes.
+        self.prefix = prefix
+        # Packet buffers (header, prefix, payload, ...) waiting for the writer thread; guarded by send_lock.
+        self.sendq = deque()
+        self.queued_bytes = 0
+        self.send_lock = threading.Lock()
+        # Set under send_lock once the session is removed; stale snapshots must not queue or send on it.
+        self.closed = False
 
 
 class Server(NetworkDevice):
-    def __init__(self, host='127.0.0.1', port=DEFAULT_PORT, protocol='gbn', max_fragment_size=3, window_size=4):
+    def __init__(self, host='127.0.0.1', port=DEFAULT_PORT, protocol='gbn', max_fragment_size=3, window_size=4,
+                 thread_cache_size=settings.THREAD_CACHE_SIZE, tcp_nodelay=True, sndbuf=settings.SOCKET_BUFFER_SIZE):
+        if not handshake_params_valid(max_fragment_size, window_size):
+            raise ValueError(SERVER_ERRORS.INVALID_PARAMS.format(max_fragment_size=HANDSHAKE_FIELD_MAX, max_window_size=MAX_WINDOW_SIZE))
         super().__init__(host, port, protocol, max_fragment_size, window_size)
         self.host = host
         self.port = port
-        self.client_sessions: Dict[str, dict] = {}
+        self.client_sessions: Dict[str, Session] = {}
+        self.tcp_nodelay = tcp_nodelay
+        self.sndbuf = sndbuf
         self._socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
         self._socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-        self._socket.settimeout(1.0)
 
         self._clients_lock = threading.Lock()
+        # One lock per accepted socket: the client's worker (ACKs, replies) and the writer thread (broadcasts)
+        # both write to it, and each must put whole packets on the stream.
+        self._write_locks: Dict[socket.socket, threading.Lock] = {}
+        # Copy-on-write view of (address, session) for handshaken clients; rebuilt under the lock, read lock-free.
+        self._sessions_snapshot: Tuple[Tuple[str, Session], ...] = ()
         self._stop_event = threading.Event()
-        self._threads: List[threading.Thread] = []
+        # stop() writes here to wake the accept loop, which otherwise blocks in select() without a timeout.
+        self._wakeup_r, self._wakeup_w = socket.socketpair()
+        self._wakeup_r.setblocking(False)
+        # Connection workers are reused across clients instead of spawning a thread per accept.
+        # A worker is held for the whole connection, so past thread_cache_size busy workers extra threads are started.
+        self.thread_cache_size = thread_cache_size
+        self._pool = ThreadPoolExecutor(max_workers=thread_cache_size, thread_name_prefix='client')
+        # Connections currently running on (or queued for) self._pool; extra threads are not counted.
+        self._pool_busy = 0
+        self._overflow_threads: List[threading.Thread] = []
+        # Broadcasts are queued per recipient and flushed by one writer thread, one write per client per wakeup.
+        self._writer_wakeup = threading.Event()
+        self._writer_thread = threading.Thread(target=self._writer_loop, name='writer', daemon=True)
 
-        self._log_queue: mp.Queue = mp.Queue()
-        self._log_process = mp.Process(target=_log_worker, args=(self._log_queue, os.path.abspath('logs/server.log')))
-        self._log_process.daemon = True
-        self._log_process.start()
+        self._event_log, self._event_log_listener = setup_file_logger(f"{__name__}.events", os.path.abspath('logs/server.log'))
 
-    def handle_syn(self, client_socket: socket.socket, client_address:str, data:dict):
+    def handle_syn(self, client_socket: socket.socket, client_address:str, data):
         """Process SYN request during handshake and negotiate connection parameters"""
-        print(f'[LOG] Received SYN from {client_address}: {data}')
+        log.debug('[LOG] Received SYN from %s: %s', client_address, data)
         
-        client_protocol = data.get('protocol', self.protocol)
-        requested_fragment_size = data.get('max_fragment_size', self.max_fragment_size)
-        requested_window_size = data.get('window_size', self.window_size)
+        client_protocol = data.protocol
+        requested_window_size = data.window_size
         
-        max_fragment_size = min(requested_fragment_size, self.max_fragment_size)
+        max_fragment_size = min(data.max_fragment_size, self.max_fragment_size)
         
-        session_id = hashlib.md5(f"{client_address}{socket.gethostname()}".encode()).hexdigest()[:8]
+        session_id = secrets.token_hex(4)
         
-        self.client_sessions[client_address] = {
-            'protocol': client_protocol,
-            'max_fragment_size': max_fragment_size,
-            'window_size': requested_window_size,
-            'session_id': session_id,
-            'handshake_complete': False,
-            'socket': client_socket,
-            'expected_seq_num': 0,
-            'nickname': None,
-        }
-        
-        response = {
-            'status': 'ok',
-            'protocol': client_protocol,
-            'max_fragment_size': max_fragment_size,
-            'window_size': requested_window_size,
-            'session_id': session_id,
-            'message': 'SYN-ACK: Parameters accepted'
-        }
+        with self._clients_lock:
+            session = self.client_sessions.get(client_address)
+            if session is None:
+                session = self.client_sessions[client_address] = Session()
+            session.socket = client_socket
+            session.protocol = client_protocol
+            session.max_fragment_size = max_fragment_size
+            session.window_size = requested_window_size
+            session.session_id = session_id
+            session.handshake_complete = False
+            session.expected_seq_num = 0
+            session.nickname = None
+            session.prefix = f"[{client_address}] ".encode('utf-8')
+            with session.send_lock:
+                session.sendq.clear()
+                session.queued_bytes = 0
         
-        packet = self.create_packet(settings.ACK_TYPE, json.dumps(response))
-        client_socket.sendall(packet)
+        response = pack_handshake(client_protocol, max_fragment_size, requested_window_size, session_id=session_id)
+        self.send_packet(client_socket, settings.ACK_TYPE, response)
         return session_id
 
-    def handle_ack(self, client_address:str, data:dict):
+    def handle_ack(self, client_address:str, data):
         """Process final ACK to complete handshake"""
-        print(f'[LOG] Received ACK from {client_address}: {data}')
-        if client_address not in self.client_sessions:
-            return False
-            
-        self.client_sessions[client_address]['handshake_complete'] = True
-        print(f'[LOG] Handshake completed for client {client_address}')
+        log.debug('[LOG] Received ACK from %s: %s', client_address, data)
+        with self._clients_lock:
+            session = self.client_sessions.get(client_address)
+            if session is None:
+                return False
+            session.handshake_complete = True
+            self._publish_sessions()
+        log.info('[LOG] Handshake completed for client %s', client_address)
         return True
 
 
-    def process_handshake(self, client_socket: socket.socket, client_address: str):
+    def process_handshake(self, client_socket: socket.socket, client_address: str, rfile):
         """Manage the complete three-way handshake process"""
-        header = client_socket.recv(self.BUFFER_SIZE)
-        if not header or len(header) < self.HEADER_SIZE:
+        header = self.read_packet(rfile)
+        if not header:
             raise ValueError(SERVER_ERRORS.INVALID_HEADER.format(client_address=client_address))
 
         parsed = self.parse_packet(header)
@@ -103,92 +142,216 @@ class Server(NetworkDevice):
         if parsed['type'] != settings.SYN_TYPE:
             raise ValueError(SERVER_ERRORS.EXPECTED_SYN.format(msg_type=parsed['type']))
 
-        data = json.loads(parsed['payload'])
-        client_protocol = data.get('protocol', 'gbn')
-        print(f"[LOG] Client requesting protocol: {client_protocol}")
+        data = unpack_handshake(parsed['payload'])
+        if data is None:
+            raise ValueError(SERVER_ERRORS.INCOMPATIBLE_HANDSHAKE.format(client_address=client_address))
+        log.info("[LOG] Client requesting protocol: %s", data.protocol)
         self.handle_syn(client_socket, client_address, data)
 
-        header = client_socket.recv(self.BUFFER_SIZE)
-        parsed = self.parse_packet(header)
+        header = self.read_packet(rfile)
+        parsed = self.parse_packet(header) if header else None
         if not parsed:
             raise ValueError(SERVER_ERRORS.FAILED_ACK.format(client_address=client_address))
 
         if parsed['type'] != settings.HANDSHAKE_ACK_TYPE:
             raise ValueError(SERVER_ERRORS.EXPECTED_ACK.format(msg_type=parsed['type']))
 
-        data = json.loads(parsed['payload'])
-        if not self.handle_ack(client_address, data):
+        data = unpack_handshake(parsed['payload'])
+        if data is None or not self.handle_ack(client_address, data):
             raise ValueError(SERVER_ERRORS.FAILED_ACK.format(client_address=client_address))
 
-        print(SERVER_LOGS.HANDSHAKE_COMPLETE.format(client_address=client_address))
+        log.info(SERVER_LOGS.HANDSHAKE_COMPLETE.format(client_address=client_address))
         return True
 
     def broadcast_to_others(self, from_address: str, payload: bytes):
-        """Envia uma mensagem completa para todos os demais clientes conectados."""
-        display = from_address
+        """Enfileira a mensagem completa para os demais clientes; a thread de escrita faz o envio."""
         with self._clients_lock:
             sess = self.client_sessions.get(from_address)
-            if sess and sess.get('nickname'):
-                display = sess['nickname']
-        try:
-            text = payload.decode('utf-8')
-            payload_to_send = f"[{display}] {text}".encode('utf-8')
-        except Exception:
-            payload_to_send = payload
+            prefix = sess.prefix if sess else b''
+        if not prefix:
+            prefix = f"[{from_address}] ".encode('utf-8')
 
-        packet = self.create_packet(settings.DATA_TYPE, payload_to_send, sequence_num=0, last_packet=True)
+        # Header, sender label and payload are shared by every recipient's queue, never concatenated.
+        header = self.create_header_for(settings.DATA_TYPE, (prefix, payload), sequence_num=0, last_packet=True)
+        size = len(header) + len(prefix) + len(payload)
 
-        with self._clients_lock:
-            for addr, sess in list(self.client_sessions.items()):
-                if addr == from_address:
+        overflowed = []
+        for addr, session in self._sessions_snapshot:
+            if addr == from_address:
+                continue
+            with session.send_lock:
+                if session.closed:
                     continue
-                sock: socket.socket = sess.get('socket')
-                if not sock:
+                if session.queued_bytes + size > settings.SENDQ_LIMIT:
+                    overflowed.append((addr, session))
                     continue
-                try:
-                    sock.sendall(packet)
-                except Exception as e:
-                    print(f"[ERROR] Failed to send to {addr}: {e}")
+                session.sendq.extend((header, prefix, payload))
+                session.queued_bytes += size
+        self._writer_wakeup.set()
+        for addr, session in overflowed:
+            self._drop_client(addr, session, f"send queue over {settings.SENDQ_LIMIT} bytes")
         try:
-            self._log_queue.put_nowait(f"BROADCAST from {from_address} full_message")
+            self._event_log.info("BROADCAST from %s full_message", from_address)
         except Exception:
             pass
 
+    def _writer_loop(self):
+        """Drain each client's send queue in vectored writes of at most WRITER_BATCH_SIZE packets."""
+        wakeup = self._writer_wakeup
+        # Each queued packet is three buffers: header, sender label, payload.
+        batch = 3 * settings.WRITER_BATCH_SIZE
+        while not self._stop_event.is_set():
+            wakeup.wait()
+            wakeup.clear()
+            for addr, session in self._sessions_snapshot:
+                with session.send_lock:
+                    if session.closed or not session.sendq:
+                        continue
+                    sendq = session.sendq
+                    buffers = [sendq.popleft() for _ in range(min(batch, len(sendq)))]
+                    session.queued_bytes -= sum(map(len, buffers))
+                    if session.sendq:
+                        wakeup.set()
+                    sock = session.socket
+                try:
+                    # SO_SNDTIMEO bounds each blocking call and the deadline bounds the whole flush,
+                    # so a client that stops reading stalls the writer for about SEND_TIMEOUT before it is dropped.
+                    with self.write_lock(sock):
+                        self.sendmsg_all(sock, buffers, timeout=settings.SEND_TIMEOUT)
+                except OSError as e:
+                    self._drop_client(addr, session, e)
+
+    def _drop_client(self, client_address: str, session: Session, reason):
+        """Disconnect a client that cannot keep up; its worker then sees EOF and removes the session."""
+        with session.send_lock:
+            if session.closed:
+                return
+            session.closed = True
+            session.sendq.clear()
+            session.queued_bytes = 0
+            sock = session.socket
+        log.warning("[ERROR] Disconnecting slow client %s: %s", client_address, reason)
+        try:
+            sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+
+    def write_lock(self, sock: socket.socket):
+        """The lock every writer of an accepted client socket must hold for the duration of a packet write."""
+        return self._write_locks.get(sock) or super().write_lock(sock)
+
+    @staticmethod
+    def _set_send_timeout(sock: socket.socket, seconds: float):
+        """Bound blocking sends with SO_SNDTIMEO, leaving blocking reads without a timeout."""
+        if sys.platform == 'win32':
+            value = struct.pack('I', int(seconds * 1000))
+        else:
+            whole = int(seconds)
+            value = struct.pack('ll', whole, int((seconds - whole) * 1_000_000))
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDTIMEO, value)
+
+    def _publish_sessions(self):
+        """Rebuild the broadcast snapshot from client_sessions; the caller must hold _clients_lock."""
+        self._sessions_snapshot = tuple(
+            (addr, sess) for addr, sess in self.client_sessions.items()
+            if sess.handshake_complete and sess.socket
+        )
+
+    def remove_session(self, client_address: str):
+        """Forget a client, drop it from the broadcast snapshot and discard anything still queued for it."""
+        with self._clients_lock:
+            session = self.client_sessions.pop(client_address, None)
+            if session is not None:
+                self._publish_sessions()
+        if session is not None:
+            with session.send_lock:
+                session.closed = True
+                session.sendq.clear()
+
     def set_nickname(self, client_address: str, nickname: str):
         with self._clients_lock:
             if client_address in self.client_sessions:
-                self.client_sessions[client_address]['nickname'] = nickname
+                session = self.client_sessions[client_address]
+                session.nickname = nickname
+                session.prefix = f"[{nickname}] ".encode('utf-8')
 
     def list_connected(self) -> List[str]:
         with self._clients_lock:
             result = []
             for addr, sess in self.client_sessions.items():
-                name = sess.get('nickname') or addr
+                name = sess.nickname or addr
                 result.append(name)
             return result
 
-    def _client_worker(self, client_socket: socket.socket, addr_tuple: Tuple[str, int]):
-        client_address = f"{addr_tuple[0]}:{addr_tuple[1]}"
-        print(SERVER_LOGS.NEW_CONNECTION.format(client_address=client_address))
+    def _dispatch_client(self, client_socket: socket.socket, client_address: str):
+        """Run the connection on a cached worker, or on a fresh thread when every cached worker is busy."""
+        with self._clients_lock:
+            pooled = self._pool_busy < self.thread_cache_size
+            if pooled:
+                self._pool_busy += 1
+            else:
+                self._overflow_threads = [t for t in self._overflow_threads if t.is_alive()]
+        if pooled:
+            self._pool.submit(self._pooled_client_worker, client_socket, client_address)
+            return
+        log.warning("[LOG] All %d cached workers busy; starting an extra thread for %s",
+                    self.thread_cache_size, client_address)
+        thread = threading.Thread(target=self._client_worker, args=(client_socket, client_address),
+                                  name=f"client-extra-{client_address}")
+        with self._clients_lock:
+            self._overflow_threads.append(thread)
+        thread.start()
+
+    def _pooled_client_worker(self, client_socket: socket.socket, client_address: str):
+        """Serve a connection on a cached worker and release the worker's slot when it ends."""
         try:
-            if self.process_handshake(client_socket, client_address):
-                with self._clients_lock:
-                    if client_address in self.client_sessions:
-                        self.client_sessions[client_address]['handshake_complete'] = True
-                self.handle_client_messages(client_socket, client_address)
+            self._client_worker(client_socket, client_address)
+        finally:
+            with self._clients_lock:
+                self._pool_busy -= 1
+
+    def _client_worker(self, client_socket: socket.socket, client_address: str):
+        log.info(SERVER_LOGS.NEW_CONNECTION.format(client_address=client_address))
+        rfile = client_socket.makefile('rb', buffering=settings.READ_BUFFER_SIZE)
+        try:
+            if self.process_handshake(client_socket, client_address, rfile):
+                self.handle_client_messages(client_socket, client_address, rfile)
         except (ConnectionError, ValueError) as e:
-            print(e)
+            log.error("%s", e)
         except Exception as e:
-            print(e)
+            log.error("%s", e)
         finally:
             try:
+                rfile.close()
                 client_socket.close()
             except Exception:
                 pass
+            self.remove_session(client_address)
             with self._clients_lock:
-                if client_address in self.client_sessions:
-                    del self.client_sessions[client_address]
-            print(SERVER_LOGS.CONNECTION_CLOSED.format(client_address=client_address))
+                self._write_locks.pop(client_socket, None)
+            log.info(SERVER_LOGS.CONNECTION_CLOSED.format(client_address=client_address))
+
+    def _accept_pending(self):
+        """Accept every connection already queued on the listener, stopping at EWOULDBLOCK."""
+        while not self._stop_event.is_set():
+            try:
+                client_socket, addr = self._socket.accept()
+            except BlockingIOError:
+                return
+            except Exception as e:
+                if not self._stop_event.is_set():
+                    log.error("[ERROR] Error accepting new connection: %s", e)
+                return
+
+            client_socket.setblocking(True)
+            self.configure_socket(client_socket, self.tcp_nodelay, self.sndbuf)
+            self._set_send_timeout(client_socket, settings.SEND_TIMEOUT)
+            client_address = f"{addr[0]}:{addr[1]}"
+            with self._clients_lock:
+                self._write_locks[client_socket] = threading.Lock()
+                if client_address not in self.client_sessions:
+                    self.client_sessions[client_address] = Session(sock=client_socket)
+            self._dispatch_client(client_socket, client_address)
 
     def start(self):
         """Initialize the server, bind to socket, and begin listening for connections (multi-cliente)."""
@@ -198,50 +361,59 @@ class Server(NetworkDevice):
                 self.port = self._socket.getsockname()[1]
             except Exception:
                 pass
-            self._socket.listen(20)
-            print(SERVER_LOGS.START.format(host=self.host, port=self.port))
-            print(SERVER_LOGS.PROTOCOL.format(protocol=self.protocol, max_fragment_size=self.max_fragment_size))
-            print(SERVER_LOGS.WINDOW.format(window_size=self.window_size))
-
-            while not self._stop_event.is_set():
-                try:
-                    client_socket, addr = self._socket.accept()
-                except socket.timeout:
-                    continue
-                except KeyboardInterrupt:
-                    print("[LOG] Server shutting down gracefully...")
-                    break
-                except Exception as e:
-                    print(f"[ERROR] Error accepting new connection: {e}")
-                    continue
+            self._socket.listen(socket.SOMAXCONN)
+            log.info(SERVER_LOGS.START.format(host=self.host, port=self.port))
+            log.info(SERVER_LOGS.PROTOCOL.format(protocol=self.protocol, max_fragment_size=self.max_fragment_size))
+            log.info(SERVER_LOGS.WINDOW.format(window_size=self.window_size))
 
-                client_address = f"{addr[0]}:{addr[1]}"
-                with self._clients_lock:
-                    self.client_sessions.setdefault(client_address, {'socket': client_socket})
-                t = threading.Thread(target=self._client_worker, args=(client_socket, addr), daemon=True)
-                t.start()
-                self._threads.append(t)
+            self._writer_thread.start()
+            self._socket.setblocking(False)
+            selector = selectors.DefaultSelector()
+            selector.register(self._socket, selectors.EVENT_READ)
+            selector.register(self._wakeup_r, selectors.EVENT_READ)
+            try:
+                while not self._stop_event.is_set():
+                    for key, _ in selector.select():
+                        if key.fileobj is self._socket:
+                            self._accept_pending()
+            except KeyboardInterrupt:
+                log.info("[LOG] Server shutting down gracefully...")
+            finally:
+                selector.close()
         finally:
             self._stop_event.set()
             try:
                 self._socket.close()
             except Exception:
                 pass
-                if t.is_alive():
-                    t.join(timeout=1.0)
+            # Unblock workers still reading from their clients so the pool can drain.
+            with self._clients_lock:
+                sockets = [sess.socket for sess in self.client_sessions.values()]
+            for sock in sockets:
+                try:
+                    sock.shutdown(socket.SHUT_RDWR)
+                except Exception:
+                    pass
+            self._pool.shutdown(wait=True)
+            with self._clients_lock:
+                overflow = list(self._overflow_threads)
+            for thread in overflow:
+                thread.join()
+            self._writer_wakeup.set()
+            for sock in (self._wakeup_r, self._wakeup_w):
+                sock.close()
             try:
-                self._log_queue.put("__STOP__")
-                self._log_process.join(timeout=2.0)
+                stop_file_logger(self._event_log_listener)
             except Exception:
                 pass
-            print(SERVER_LOGS.SOCKET_CLOSED)
+            log.info(SERVER_LOGS.SOCKET_CLOSED)
 
     def stop(self):
         """Signal the server to stop accepting and shutdown gracefully."""
         self._stop_event.set()
         try:
-            self._socket.close()
-        except Exception:
+            self._wakeup_w.send(b'\0')
+        except OSError:
             pass
 
 
@@ -255,18 +427,30 @@ if __name__ == '__main__':
                             help='Reliable transfer protocol (Go-Back-N or Selective Repeat)')
         parser.add_argument('--window-size', type=int, default=4,
                             help='Sliding window size (number of packets in flight)')
+        parser.add_argument('--thread-cache-size', type=int, default=settings.THREAD_CACHE_SIZE,
+                            help='Maximum number of reusable connection worker threads')
+        parser.add_argument('--tcp-nodelay', type=int, choices=[0, 1], default=1,
+                            help='Disable Nagle on client sockets (1) or leave it enabled (0)')
+        parser.add_argument('--log-level', choices=['DEBUG', 'INFO', 'WARNING', 'ERROR'], default='INFO',
+                            help='Console log level (DEBUG adds handshake payload dumps)')
+        parser.add_argument('--sndbuf', type=int, default=settings.SOCKET_BUFFER_SIZE,
+                            help='SO_SNDBUF size in bytes for client sockets')
     
         args = parser.parse_args()
+        setup_logging(level=getattr(logging, args.log_level))
     
         server = Server(
             host=args.host,
             port=args.port,
             max_fragment_size=args.max_fragment_size,
             protocol=args.protocol,
-            window_size=args.window_size
+            window_size=args.window_size,
+            thread_cache_size=args.thread_cache_size,
+            tcp_nodelay=bool(args.tcp_nodelay),
+            sndbuf=args.sndbuf
         )
         
         server.start()
     
     except Exception as e:
-        print(f"[ERROR] An error occurred: {e}")
+        log.error("[ERROR] An error occurred: %s", e)
@@ -1,7 +1,8 @@
 import os
+import sys
 from src.client import Client
+from src.network_device import json_dumps
 from typing import TYPE_CHECKING
-import json
 
 from src.core import settings
 from src.constants.constants_client import CLIENT_LOGS, CLIENT_ERRORS
@@ -54,14 +55,18 @@ class TerminalUI:
 
     def show_main_menu(self):
         """Display the main menu options"""
-        print("\n===== MAIN MENU =====")
-        print("Your current protocol {}".format(self.client.protocol.upper()))
-        print("1. Send Message")
-        print("2. Configure Window Size (current: {})".format(self.client.window_size))
-        print("3. Configure Simulation Mode (current: {})".format(self.client.simulation_mode.capitalize()))
-        print("4. Show Status")
-        print("5. Reset Simulation")
-        print("6. Exit")
+        lines = [
+            "\n===== MAIN MENU =====",
+            "Your current protocol {}".format(self.client.protocol.upper()),
+            "1. Send Message",
+            "2. Configure Window Size (current: {})".format(self.client.window_size),
+            "3. Configure Simulation Mode (current: {})".format(self.client.simulation_mode.capitalize()),
+            "4. Show Status",
+            "5. Reset Simulation",
+            "6. Exit",
+        ]
+        sys.stdout.write("\n".join(lines) + "\n")
+        sys.stdout.flush()
 
     def send_message_menu(self):
         """Menu for sending a message"""
@@ -187,8 +192,7 @@ class TerminalUI:
                 'delay_prob': delay_prob,
                 'delay_time': delay_time
             }
-            config_packet = self.client.create_packet(settings.ERROR_CODE, json.dumps(config_data))
-            self.client._socket.sendall(config_packet)
+            self.client.send_packet(self.client._socket, settings.ERROR_CODE, json_dumps(config_data))
 
             print("[CONFIG] Channel configuration sent to server.")
         except Exception as e:
@@ -198,25 +202,29 @@ class TerminalUI:
     def show_status(self):
         """Display current protocol and simulation status"""
         self.clear_screen()
-        print("\n===== PROTOCOL STATUS =====")
-        print(f"Protocol: {self.client.protocol.upper()}")
-        print(f"Window size: {self.client.window_size} packets")
-        print(f"Timeout: {self.client.timeout}s")
-        print(f"Fragment size: {self.client.max_fragment_size} characters")
-        print(f"Base sequence: {self.client.base_seq_num}")
-        print(f"Next sequence: {self.client.next_seq_num}")
-
-        print("\n===== SIMULATION STATUS =====")
-        print(f"Simulation mode: {self.client.simulation_mode.capitalize()}")
-        print(f"Loss probability: {self.client.loss_probability:.2f}")
-        print(f"Corruption probability: {self.client.corruption_probability:.2f}")
-        print(f"Delay probability: {self.client.delay_probability:.2f}")
-        print(f"Delay time: {self.client.delay_time:.2f}s")
-
-        print("\n===== CONNECTION STATUS =====")
-        print(f"Connected: {'Yes' if self.client.is_connected else 'No'}")
-        print(f"Server address: {self.client.server_addr}:{self.client.server_port}")
-        print(f"Session ID: {self.client.session_id if self.client.session_id else 'N/A'}")
+        lines = [
+            "\n===== PROTOCOL STATUS =====",
+            f"Protocol: {self.client.protocol.upper()}",
+            f"Window size: {self.client.window_size} packets",
+            f"Timeout: {self.client.timeout}s",
+            f"Fragment size: {self.client.max_fragment_size} bytes",
+            f"Base sequence: {self.client.base_seq_num}",
+            f"Next sequence: {self.client.next_seq_num}",
+
+            "\n===== SIMULATION STATUS =====",
+            f"Simulation mode: {self.client.simulation_mode.capitalize()}",
+            f"Loss probability: {self.client.loss_probability:.2f}",
+            f"Corruption probability: {self.client.corruption_probability:.2f}",
+            f"Delay probability: {self.client.delay_probability:.2f}",
+            f"Delay time: {self.client.delay_time:.2f}s",
+
+            "\n===== CONNECTION STATUS =====",
+            f"Connected: {'Yes' if self.client.is_connected else 'No'}",
+            f"Server address: {self.client.server_addr}:{self.client.server_port}",
+            f"Session ID: {self.client.session_id if self.client.session_id else 'N/A'}",
+        ]
+        sys.stdout.write("\n".join(lines) + "\n")
+        sys.stdout.flush()
 
     def reset_simulation(self):
         """Reset simulation to normal mode"""
@@ -236,8 +244,7 @@ class TerminalUI:
             'delay_prob': delay_prob,
             'delay_time': delay_time
         }
-        config_packet = self.client.create_packet(settings.ERROR_CODE, json.dumps(config_data))
-        self.client._socket.sendall(config_packet)
+        self.client.send_packet(self.client._socket, settings.ERROR_CODE, json_dumps(config_data))
         self.clear_screen()
         print("[CONFIG] Simulation reset to normal mode")
 class ServerTerminalUI:
@@ -252,20 +259,26 @@ class ServerTerminalUI:
     def show_server_status(self):
         """Display current server status"""
         self.clear_screen()
-        print("\n===== SERVER STATUS =====")
-        print(f"Server running at: {self.server.host}:{self.server.port}")
-        print(f"Protocol: {self.server.protocol.upper()}")
-        print(f"Max Fragment Size: {self.server.max_fragment_size} characters")
-        print(f"Window Size: {self.server.window_size} packets")
-
-        print("\n===== ACTIVE CONNECTIONS =====")
-        if not self.server.client_sessions:
-            print("No active connections")
-        else:
-            for addr, session in self.server.client_sessions.items():
-                print(f"\nClient: {addr}")
-                print(f"  Session ID: {session.get('session_id', 'N/A')}")
-                print(f"  Protocol: {session.get('protocol', 'N/A')}")
-                print(f"  Max Fragment Size: {session.get('max_fragment_size', 'N/A')}")
-                print(f"  Handshake Complete: {'Yes' if session.get('handshake_complete', False) else 'No'}")
-                print(f"  Expected Sequence: {session.get('expected_seq_num', 'N/A')}")
\ No newline at end of file
+        lines = [
+            "\n===== SERVER STATUS =====",
+            f"Server running at: {self.server.host}:{self.server.port}",
+            f"Protocol: {self.server.protocol.upper()}",
+            f"Max Fragment Size: {self.server.max_fragment_size} bytes",
+            f"Window Size: {self.server.window_size} packets",
+
+            "\n===== ACTIVE CONNECTIONS =====",
+        ]
+        sessions = list(self.server.client_sessions.items())
+        if not sessions:
+            lines.append("No active connections")
+        for addr, session in sessions:
+            lines += [
+                f"\nClient: {addr}",
+                f"  Session ID: {session.session_id or 'N/A'}",
+                f"  Protocol: {session.protocol or 'N/A'}",
+                f"  Max Fragment Size: {session.max_fragment_size or 'N/A'}",
+                f"  Handshake Complete: {'Yes' if session.handshake_complete else 'No'}",
+                f"  Expected Sequence: {session.expected_seq_num}",
+            ]
+        sys.stdout.write("\n".join(lines) + "\n")
+        sys.stdout.flush()
\ No newline at end of file